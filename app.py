@@ -1,97 +1,215 @@
 # app.py - Enhanced ATS with Better Algorithms
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
 import os
 import json
+import heapq
+import functools
+import time
 from werkzeug.utils import secure_filename
 from datetime import datetime
-import re
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
 
 # Import our custom modules
 from resume_parser import ResumeParser
 from matching_engine import MatchingEngine
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads/resumes'
+# Absolute, so uploads (saved relative to the working directory) and send_from_directory
+# (which resolves relative paths against app.root_path) agree on where resumes live
+app.config['UPLOAD_FOLDER'] = os.path.abspath(os.path.join('uploads', 'resumes'))
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Let a fronting web server (nginx/Apache) stream files via X-Sendfile when enabled
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('data', exist_ok=True)
 
+# Candidates and jobs live in separate folders so each listing only sees its own kind
+CANDIDATES_DIR = os.path.join('data', 'candidates')
+JOBS_DIR = os.path.join('data', 'jobs')
+os.makedirs(CANDIDATES_DIR, exist_ok=True)
+os.makedirs(JOBS_DIR, exist_ok=True)
+
 # Initialize components
 resume_parser = ResumeParser()
 matching_engine = MatchingEngine()
 
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
+ALLOWED_EXTENSIONS = frozenset({'pdf', 'doc', 'docx', 'txt'})
+
+def allowed_file(filename):
+    """Check the upload's extension against ALLOWED_EXTENSIONS"""
+    stem, _, extension = filename.rpartition('.')
+    return bool(stem) and extension.lower() in ALLOWED_EXTENSIONS
+
+# Match results keyed by job file and candidate folder versions
+_match_cache = {}
+MATCH_CACHE_SIZE = 256
+
+# Resume parsing runs off the request thread; in-flight jobs are tracked by candidate id
+PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+_parse_status = {}
+# Failed parses wait here (with their failure time) until polled or PARSE_FAILURE_TTL expires
+_parse_failures = {}
+PARSE_FAILURE_TTL = 3600
+
+# Directories larger than this are loaded with a thread pool
+PARALLEL_LOAD_THRESHOLD = 32
+LOAD_WORKERS = 8
+
+def migrate_legacy_records(data_dir='data'):
+    """Move records saved directly under data/ into the per-kind folders"""
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if not entry.is_file(follow_symlinks=False) or not entry.name.endswith('.json'):
+                continue
+            target_dir = JOBS_DIR if entry.name.startswith('job_') else CANDIDATES_DIR
+            os.replace(entry.path, os.path.join(target_dir, entry.name))
+
+def candidate_record_path(candidate_id):
+    return os.path.join(CANDIDATES_DIR, f'{candidate_id}.json')
+
+def job_record_path(job_id):
+    return os.path.join(JOBS_DIR, f'{job_id}.json')
+
+def list_records(record_dir):
+    """List record file paths in a single folder"""
+    if not os.path.exists(record_dir):
+        return []
+    
+    # Only finished .json files count; in-progress writes use a .tmp suffix
+    with os.scandir(record_dir) as it:
+        return [entry.path for entry in it
+                if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False)]
+
+def scan_data_dir():
+    """List record paths for both candidates and jobs"""
+    return list_records(CANDIDATES_DIR), list_records(JOBS_DIR)
+
+migrate_legacy_records()
+
+@functools.lru_cache(maxsize=1024)
+def _load_json_file(path, mtime_ns):
+    """Parse a JSON file; mtime_ns is part of the cache key so edits invalidate it"""
+    # Both parsers take raw bytes and decode UTF-8 themselves
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def load_json_cached(path):
+    """Load a JSON record, reusing the parsed copy until the file changes on disk"""
+    return _load_json_file(path, os.stat(path).st_mtime_ns)
+
+def save_json(path, data):
+    """Write a JSON record to disk atomically so readers never see a torn file"""
+    tmp_path = path + '.tmp'
+    # Compact output by default; pretty-print only when debugging
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if app.debug:
+            option |= orjson.OPT_INDENT_2
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if app.debug:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            else:
+                json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def record_timestamp(path):
+    """Sortable YYYYMMDD_HHMMSS stamp embedded in a record filename"""
+    name = os.path.basename(path)
+    if name.startswith('job_'):
+        return name[4:19]
+    return name[:15]
+
+def _load_record(path):
+    """Load a single record, returning None if it can't be read"""
+    try:
+        return load_json_cached(path)
+    except Exception as e:
+        print(f"Error loading {os.path.basename(path)}: {e}")
+        return None
+
+def load_records(paths):
+    """Load JSON records from the given paths, skipping unreadable files"""
+    if len(paths) > PARALLEL_LOAD_THRESHOLD:
+        # File I/O dominates on large directories; overlap it across threads
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+            results = list(executor.map(_load_record, paths))
+    else:
+        results = [_load_record(path) for path in paths]
+    return [record for record in results if record is not None]
 
 def load_all_candidates():
     """Load all candidate data from files"""
-    candidates = []
-    data_dir = 'data'
-    
-    if not os.path.exists(data_dir):
-        return candidates
-    
-    for filename in os.listdir(data_dir):
-        if filename.startswith('job_'):
-            continue  # Skip job files
-        
-        try:
-            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
-                candidate_data = json.load(f)
-                candidates.append(candidate_data)
-        except Exception as e:
-            print(f"Error loading {filename}: {e}")
-            continue
+    candidate_paths = list_records(CANDIDATES_DIR)
     
-    # Sort by upload date (newest first)
-    candidates.sort(key=lambda x: x.get('upload_date', ''), reverse=True)
-    return candidates
+    # Sort by upload date (newest first) using the timestamp that prefixes each filename
+    return load_records(sorted(candidate_paths, key=record_timestamp, reverse=True))
 
 def load_all_jobs():
     """Load all job postings from files"""
-    jobs = []
-    data_dir = 'data'
+    job_paths = list_records(JOBS_DIR)
     
-    if not os.path.exists(data_dir):
-        return jobs
+    # Sort by creation date (newest first) using the timestamp in each filename
+    return load_records(sorted(job_paths, key=record_timestamp, reverse=True))
+
+def cached_page(*record_dirs):
+    """Reuse a page's rendered HTML until one of record_dirs changes.
     
-    for filename in os.listdir(data_dir):
-        if not filename.startswith('job_'):
-            continue  # Skip candidate files
+    Records are written with os.replace, so any add, update or delete bumps
+    the folder's mtime.
+    """
+    def decorator(view):
+        cache = {}
         
-        try:
-            with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
-                job_data = json.load(f)
-                jobs.append(job_data)
-        except Exception as e:
-            print(f"Error loading {filename}: {e}")
-            continue
-    
-    # Sort by creation date (newest first)
-    jobs.sort(key=lambda x: x.get('created_date', ''), reverse=True)
-    return jobs
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = tuple(os.stat(record_dir).st_mtime_ns for record_dir in record_dirs)
+            # Key and page are stored as one tuple so overlapping renders can't pair
+            # a page with another render's key
+            entry = cache.get('entry')
+            if entry is None or entry[0] != key:
+                entry = (key, view(*args, **kwargs))
+                cache['entry'] = entry
+            return entry[1]
+        return wrapper
+    return decorator
 
 @app.route('/')
+@cached_page(CANDIDATES_DIR, JOBS_DIR)
 def index():
-    # Load existing data
-    candidates = load_all_candidates()
-    jobs = load_all_jobs()
+    candidate_paths, job_paths = scan_data_dir()
+    
+    # Filenames carry a YYYYMMDD_HHMMSS stamp, so only the newest 5 of each need parsing
+    candidates = load_records(heapq.nlargest(5, candidate_paths, key=record_timestamp))
+    jobs = load_records(heapq.nlargest(5, job_paths, key=record_timestamp))
     
     return render_template('index.html', 
-                         candidates=candidates[:5],  # Show last 5 candidates
-                         jobs=jobs[:5],  # Show last 5 jobs
-                         total_candidates=len(candidates),
-                         total_jobs=len(jobs))
+                         candidates=candidates,  # Show last 5 candidates
+                         jobs=jobs,  # Show last 5 jobs
+                         total_candidates=len(candidate_paths),
+                         total_jobs=len(job_paths))
 
 @app.route('/candidates')
+@cached_page(CANDIDATES_DIR)
 def view_all_candidates():
     """View all uploaded candidates"""
     candidates = load_all_candidates()
     return render_template('all_candidates.html', candidates=candidates)
 
 @app.route('/jobs')
+@cached_page(JOBS_DIR)
 def view_all_jobs():
     """View all job postings"""
     jobs = load_all_jobs()
@@ -101,6 +219,38 @@ def view_all_jobs():
 # def index():
 #     return render_template('index.html')
 
+def _parse_and_store(filepath, filename, original_filename, candidate_id, upload_time):
+    """Parse an uploaded resume and save the candidate record (runs on PARSE_EXECUTOR)"""
+    try:
+        parsed_data = resume_parser.parse_resume(filepath)
+        
+        # Save parsed data
+        candidate_data = {
+            'id': candidate_id,
+            'filename': filename,
+            'original_filename': original_filename,
+            'upload_date': upload_time.isoformat(),
+            'parsed_data': parsed_data,
+            # Stored so matching doesn't re-tokenize the resume for every job
+            'features': matching_engine.build_candidate_features(parsed_data['raw_text'])
+        }
+        
+        # Save to JSON file (simulating database)
+        save_json(candidate_record_path(candidate_id), candidate_data)
+    except Exception as e:
+        # Don't keep uploads we couldn't turn into a candidate record
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        
+        # Drop failures nobody polled for, so they can't pile up
+        now = time.monotonic()
+        for stale_id in [cid for cid, (failed_at, _) in list(_parse_failures.items())
+                         if now - failed_at > PARSE_FAILURE_TTL]:
+            _parse_failures.pop(stale_id, None)
+        _parse_failures[candidate_id] = (now, {'status': 'failed', 'error': f'Failed to parse resume: {str(e)}'})
+    finally:
+        _parse_status.pop(candidate_id, None)
+
 @app.route('/upload-resume', methods=['GET', 'POST'])
 def upload_resume():
     if request.method == 'POST':
@@ -113,36 +263,26 @@ def upload_resume():
             
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_")
+            now = datetime.now()  # One clock read for both the filename and upload_date
+            timestamp = now.strftime("%Y%m%d_%H%M%S_")
             filename = timestamp + filename
             filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
             
-            # Parse the resume
-            try:
-                parsed_data = resume_parser.parse_resume(filepath)
-                
-                # Save parsed data
-                candidate_id = filename.replace('.', '_')
-                candidate_data = {
-                    'id': candidate_id,
-                    'filename': filename,
-                    'original_filename': file.filename,
-                    'upload_date': datetime.now().isoformat(),
-                    'parsed_data': parsed_data
-                }
-                
-                # Save to JSON file (simulating database)
-                with open(f'data/{candidate_id}.json', 'w', encoding='utf-8') as f:
-                    json.dump(candidate_data, f, indent=2, ensure_ascii=False)
-                
-                return jsonify({
-                    'message': 'Resume uploaded and parsed successfully',
-                    'candidate_id': candidate_id,
-                    'parsed_data': parsed_data
-                })
-            except Exception as e:
-                return jsonify({'error': f'Failed to parse resume: {str(e)}'}), 500
+            # Write to a temporary name first so a half-written upload is never picked up
+            partial_path = filepath + '.part'
+            file.save(partial_path)
+            os.replace(partial_path, filepath)
+            
+            # Parse in the background so the upload request returns immediately
+            candidate_id = filename.replace('.', '_')
+            _parse_status[candidate_id] = {'status': 'queued'}
+            PARSE_EXECUTOR.submit(_parse_and_store, filepath, filename, file.filename, candidate_id, now)
+            
+            return jsonify({
+                'message': 'Resume uploaded, parsing in progress',
+                'candidate_id': candidate_id,
+                'status': 'queued'
+            }), 202
         else:
             return jsonify({'error': 'Invalid file type'}), 400
     
@@ -157,8 +297,9 @@ def create_job():
         # Extract dynamic keywords from job description
         dynamic_keywords = matching_engine.extract_job_keywords(job_description)
         
+        now = datetime.now()  # One clock read for both the id and created_date
         job_data = {
-            'id': f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'id': f"job_{now.strftime('%Y%m%d_%H%M%S')}",
             'title': request.form.get('title'),
             'description': job_description,
             'required_skills': [skill.strip() for skill in request.form.get('required_skills', '').split(',') if skill.strip()],
@@ -167,12 +308,11 @@ def create_job():
             'location': request.form.get('location', ''),
             'job_type': request.form.get('job_type', 'Full-time'),
             'dynamic_keywords': dynamic_keywords,  # AI-extracted keywords
-            'created_date': datetime.now().isoformat()
+            'created_date': now.isoformat()
         }
         
         # Save job posting
-        with open(f"data/{job_data['id']}.json", 'w', encoding='utf-8') as f:
-            json.dump(job_data, f, indent=2, ensure_ascii=False)
+        save_json(job_record_path(job_data['id']), job_data)
         
         return redirect(url_for('match_candidates', job_id=job_data['id']))
     
@@ -181,46 +321,93 @@ def create_job():
 @app.route('/match-candidates/<job_id>')
 def match_candidates(job_id):
     # Load job data
+    job_path = job_record_path(job_id)
     try:
-        with open(f'data/{job_id}.json', 'r', encoding='utf-8') as f:
-            job_data = json.load(f)
+        job_data = load_json_cached(job_path)
     except FileNotFoundError:
         return "Job not found", 404
     
-    # Load all candidates
-    candidates = load_all_candidates()
+    # Matching is deterministic in the job and candidate files, so reuse the
+    # previous result until either changes. Candidate records are written with
+    # os.replace, so the folder's mtime acts as a version for the whole set.
+    cache_key = (
+        job_id,
+        os.stat(job_path).st_mtime_ns,
+        os.stat(CANDIDATES_DIR).st_mtime_ns
+    )
+    matches = _match_cache.get(cache_key)
     
-    # Enhanced matching with dynamic keywords
-    matches = matching_engine.match_candidates_enhanced(job_data, candidates)
+    if matches is None:
+        # Load all candidates
+        candidates = load_all_candidates()
+        
+        # Enhanced matching with dynamic keywords
+        matches = matching_engine.match_candidates_enhanced(
+            job_data, candidates, dynamic_keywords=job_data.get('dynamic_keywords', [])
+        )
+        
+        if len(_match_cache) >= MATCH_CACHE_SIZE:
+            _match_cache.clear()
+        _match_cache[cache_key] = matches
     
     return render_template('matches.html', job=job_data, matches=matches)
 
 @app.route('/candidate/<candidate_id>')
 def view_candidate(candidate_id):
     try:
-        with open(f'data/{candidate_id}.json', 'r', encoding='utf-8') as f:
-            candidate_data = json.load(f)
+        candidate_data = load_json_cached(candidate_record_path(candidate_id))
         return render_template('candidate_detail.html', candidate=candidate_data)
     except FileNotFoundError:
         return "Candidate not found", 404
 
+@app.route('/resume-file/<candidate_id>')
+def download_resume(candidate_id):
+    """Serve the original resume file"""
+    try:
+        candidate_data = load_json_cached(candidate_record_path(candidate_id))
+    except FileNotFoundError:
+        return "Candidate not found", 404
+    
+    # send_from_directory hands the file to the WSGI server's file wrapper (sendfile
+    # where available) and answers conditional/range requests itself
+    return send_from_directory(app.config['UPLOAD_FOLDER'], candidate_data['filename'])
+
 @app.route('/job/<job_id>')
 def view_job(job_id):
     try:
-        with open(f'data/{job_id}.json', 'r', encoding='utf-8') as f:
-            job_data = json.load(f)
+        job_data = load_json_cached(job_record_path(job_id))
         return render_template('job_detail.html', job=job_data)
     except FileNotFoundError:
         return "Job not found", 404
 
+@app.route('/api/candidate-status/<candidate_id>')
+def get_candidate_status(candidate_id):
+    """Poll the background parse of an uploaded resume"""
+    failure = _parse_failures.pop(candidate_id, None)
+    if failure is not None:
+        return jsonify(failure[1]), 500
+    
+    status = _parse_status.get(candidate_id)
+    if status is not None:
+        return jsonify(status)
+    
+    try:
+        candidate_data = load_json_cached(candidate_record_path(candidate_id))
+        return jsonify({
+            'status': 'done',
+            'candidate_id': candidate_id,
+            'parsed_data': candidate_data['parsed_data']
+        })
+    except FileNotFoundError:
+        return jsonify({'error': 'Candidate not found'}), 404
+
 @app.route('/api/suggestions/<candidate_id>')
 def get_suggestions(candidate_id):
     """Get improvement suggestions for a candidate's resume"""
     try:
-        with open(f'data/{candidate_id}.json', 'r', encoding='utf-8') as f:
-            candidate_data = json.load(f)
+        candidate_data = load_json_cached(candidate_record_path(candidate_id))
         
-        suggestions = matching_engine.generate_suggestions(candidate_data['parsed_data'])
+        suggestions = [dict(s) for s in matching_engine.generate_suggestions(candidate_data['parsed_data'])]
         return jsonify({'suggestions': suggestions})
     except FileNotFoundError:
         return jsonify({'error': 'Candidate not found'}), 404
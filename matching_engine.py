@@ -1,8 +1,227 @@
 # matching_engine.py - Enhanced Candidate Matching and Suggestion Engine
 import re
+import heapq
 from collections import Counter
+from dataclasses import dataclass
+from operator import itemgetter
+from types import MappingProxyType
 import math
 
+
+# Common words ignored when extracting keywords
+_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her',
+    'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its',
+    'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'she', 'use',
+    'way', 'will', 'have', 'been', 'that', 'this', 'with', 'from', 'they', 'know',
+    'want', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here',
+    'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them',
+    'well', 'were', 'what', 'your', 'work', 'years', 'would', 'there', 'said',
+    'each', 'which', 'their', 'called', 'other', 'made', 'more', 'find', 'where'
+})
+
+# Job descriptions also drop generic posting vocabulary
+_JOB_STOP_WORDS = _STOP_WORDS | {'should', 'must', 'able', 'experience', 'candidate', 'position', 'role', 'job'}
+
+# Enhanced skill synonyms: main skill -> aliases
+_SKILL_SYNONYMS = {
+    'javascript': ('js', 'ecmascript', 'node.js', 'nodejs'),
+    'python': ('py',),
+    'react': ('reactjs', 'react.js'),
+    'angular': ('angularjs', 'angular.js'),
+    'machine learning': ('ml', 'artificial intelligence', 'ai'),
+    'amazon web services': ('aws',),
+    'microsoft azure': ('azure',),
+    'google cloud': ('gcp', 'google cloud platform'),
+    'docker': ('containerization',),
+    'kubernetes': ('k8s', 'container orchestration'),
+    'sql': ('mysql', 'postgresql', 'database'),
+    'css': ('css3', 'cascading style sheets'),
+    'html': ('html5', 'hypertext markup language')
+}
+
+
+def _build_related_skills(synonyms):
+    """Invert a main skill -> aliases table into skill -> skills that count as a match for it"""
+    # A skill's related set is its own aliases plus every main skill it is an alias of
+    related = {}
+    for main_skill, aliases in synonyms.items():
+        related.setdefault(main_skill, set()).update(aliases)
+        for alias in aliases:
+            related.setdefault(alias, set()).add(main_skill)
+    return {skill: frozenset(skills) for skill, skills in related.items()}
+
+
+_RELATED_SKILLS = _build_related_skills(_SKILL_SYNONYMS)
+
+# Common spelling variations normalized by _skills_similar
+_SIMILAR_SKILL_ALIASES = {
+    'js': 'javascript',
+    'react.js': 'react',
+    'node.js': 'nodejs',
+    'ai': 'artificial intelligence',
+    'ml': 'machine learning'
+}
+
+# (degree keyword, level) pairs in scan order for _get_education_level
+_EDUCATION_HIERARCHY = (
+    ('high school', 1),
+    ('diploma', 2),
+    ('certificate', 2),
+    ('associate', 3),
+    ('bachelor', 4),
+    ('master', 5),
+    ('mba', 6),
+    ('phd', 7),
+    ('doctorate', 7)
+)
+
+# Suggestion templates shared by every generate_suggestions call (read-only)
+_SUGGESTIONS = {
+    'skills_critical': MappingProxyType({
+        'category': 'Skills',
+        'priority': 'Critical',
+        'suggestion': 'Add more technical skills to your resume. Include programming languages, frameworks, tools, and technologies you have experience with.',
+        'impact': 'Significantly improves keyword matching and demonstrates technical competency'
+    }),
+    'skills_expand': MappingProxyType({
+        'category': 'Skills',
+        'priority': 'High',
+        'suggestion': 'Expand your skills section with more specialized technologies and emerging skills relevant to your field.',
+        'impact': 'Helps you stand out for advanced positions and increases ATS matching'
+    }),
+    'experience_more': MappingProxyType({
+        'category': 'Experience',
+        'priority': 'High',
+        'suggestion': 'Strengthen your experience section by including internships, projects, volunteer work, or part-time roles.',
+        'impact': 'Demonstrates practical application of skills and increases experience score'
+    }),
+    'experience_titles': MappingProxyType({
+        'category': 'Experience',
+        'priority': 'Medium',
+        'suggestion': 'Use more specific job titles and include quantifiable achievements with metrics and numbers.',
+        'impact': 'Makes your experience more concrete and measurable for recruiters'
+    }),
+    'education_missing': MappingProxyType({
+        'category': 'Education',
+        'priority': 'Medium',
+        'suggestion': 'Include your educational background, certifications, or relevant coursework.',
+        'impact': 'Meets basic educational requirements and improves credibility'
+    }),
+    'content_expand': MappingProxyType({
+        'category': 'Content',
+        'priority': 'Critical',
+        'suggestion': 'Expand your resume with more detailed descriptions of your experience and achievements.',
+        'impact': 'Provides more context for ATS matching and gives recruiters better insights'
+    }),
+    'content_condense': MappingProxyType({
+        'category': 'Content',
+        'priority': 'Low',
+        'suggestion': 'Consider condensing your resume to focus on the most relevant and recent experiences.',
+        'impact': 'Improves readability and focuses attention on key qualifications'
+    }),
+    'contact_email': MappingProxyType({
+        'category': 'Contact Info',
+        'priority': 'Critical',
+        'suggestion': 'Add a professional email address to your resume.',
+        'impact': 'Essential for recruiters to contact you - missing email is a major red flag'
+    }),
+    'contact_phone': MappingProxyType({
+        'category': 'Contact Info',
+        'priority': 'High',
+        'suggestion': 'Include a phone number with proper formatting.',
+        'impact': 'Provides additional contact method and shows professionalism'
+    }),
+    'contact_linkedin': MappingProxyType({
+        'category': 'Contact Info',
+        'priority': 'High',
+        'suggestion': 'Include your LinkedIn profile URL.',
+        'impact': 'Allows recruiters to see your professional network and endorsements'
+    }),
+    'keywords_variety': MappingProxyType({
+        'category': 'Keywords',
+        'priority': 'Medium',
+        'suggestion': 'Use more varied vocabulary and industry-specific terms throughout your resume.',
+        'impact': 'Improves matching with diverse job descriptions and shows depth of knowledge'
+    })
+}
+
+# Calculator results for jobs with nothing to match a component against (read-only)
+_FULL_SCORE = MappingProxyType({'score': 1.0})
+_NO_SKILLS_REQUIRED = MappingProxyType({'score': 1.0, 'matched_count': 0, 'missing_count': 0, 'total_required': 0})
+_NO_DYNAMIC_KEYWORDS = MappingProxyType({'score': 1.0, 'matched_count': 0})
+
+# Patterns used by extract_job_keywords; matched against lowercased text
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_ACRONYM_RE = re.compile(r'\b[A-Z]{2,}\b', re.IGNORECASE)  # Acronyms (AWS, API, SQL)
+_TECH_SUFFIX_RE = re.compile(r'\b\w*(?:js|sql|api|sdk|ide|ui|ux|css|html|xml|json)\b', re.IGNORECASE)  # Technical suffixes
+_POP_TECH_RE = re.compile(r'\b(?:python|java|javascript|react|angular|node|docker|kubernetes|aws|azure|gcp)\b', re.IGNORECASE)  # Popular techs
+
+# Whole words of 4+ ASCII letters, i.e. the tokens _extract_meaningful_keywords keeps
+_MEANINGFUL_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+
+@dataclass
+class PreparedJob:
+    """Job-side matching inputs, derived once per match run instead of once per candidate"""
+    required_skills: list
+    required_skills_lower: tuple  # (original, lowercased) pairs for non-blank skills
+    required_education_level: int
+    job_word_freq: Counter
+    job_total_weight: int
+    dynamic_keywords: list
+    dynamic_keyword_terms: tuple  # see _prepare_dynamic_keywords
+
+
+@dataclass
+class PreparedCandidate:
+    """Candidate-side matching inputs, derived once and reused for every job"""
+    skills_lower: frozenset
+    keyword_counts: dict
+    education_level: int
+    text_lower: str  # lowercased raw_text for substring keyword counts
+
+
+@dataclass(slots=True)
+class MatchBreakdown:
+    """Per-component match percentages"""
+    skills: float
+    experience: float
+    education: float
+    keywords: float
+    dynamic_keywords: float
+    
+    def to_dict(self):
+        """Plain dict form for JSON serialization"""
+        return {
+            'skills': self.skills,
+            'experience': self.experience,
+            'education': self.education,
+            'keywords': self.keywords,
+            'dynamic_keywords': self.dynamic_keywords
+        }
+
+
+@dataclass(slots=True)
+class MatchResult:
+    """One ranked candidate returned by match_candidates_enhanced"""
+    candidate: dict
+    match_score: float
+    match_breakdown: MatchBreakdown
+    strengths: list
+    gaps: list
+    
+    def to_dict(self):
+        """Plain dict form for JSON serialization"""
+        return {
+            'candidate': self.candidate,
+            'match_score': self.match_score,
+            'match_breakdown': self.match_breakdown.to_dict(),
+            'strengths': self.strengths,
+            'gaps': self.gaps
+        }
+
+
 class MatchingEngine:
     def __init__(self):
         # Enhanced weights for better matching
@@ -15,17 +234,17 @@ class MatchingEngine:
         }
         
         # Enhanced education level hierarchy
-        self.education_hierarchy = {
-            'high school': 1,
-            'diploma': 2,
-            'certificate': 2,
-            'associate': 3,
-            'bachelor': 4,
-            'master': 5,
-            'mba': 6,
-            'phd': 7,
-            'doctorate': 7
-        }
+        self.education_hierarchy = dict(_EDUCATION_HIERARCHY)
+        
+        # Memoized _get_education_level results; degree strings repeat across candidates
+        self._education_level_cache = {}
+        
+        # Memoized _keyword_counts results keyed by the full text
+        self._keyword_count_cache = {}
+        
+        # prepare_candidate results keyed by (candidate id, upload date); kept here so
+        # callers' (often shared, JSON-serialized) candidate records are never modified
+        self._prepared_candidate_cache = {}
     
     def extract_job_keywords(self, job_description):
         """Extract dynamic keywords from job description using NLP techniques"""
@@ -35,37 +254,14 @@ class MatchingEngine:
         # Clean and tokenize
         text = job_description.lower()
         
-        # Remove common stop words
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her',
-            'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its',
-            'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'she', 'use',
-            'way', 'will', 'have', 'been', 'that', 'this', 'with', 'from', 'they', 'know',
-            'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here',
-            'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them',
-            'well', 'were', 'what', 'your', 'work', 'years', 'would', 'there', 'said',
-            'each', 'which', 'their', 'called', 'other', 'made', 'more', 'find', 'where',
-            'should', 'must', 'able', 'experience', 'candidate', 'position', 'role', 'job'
-        }
-        
-        # Extract meaningful words (3+ characters, not numbers)
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text)
-        meaningful_words = [word for word in words if word not in stop_words]
-        
-        # Count frequency
-        word_freq = Counter(meaningful_words)
-        
-        # Extract technical terms and skills
-        technical_patterns = [
-            r'\b[A-Z]{2,}\b',  # Acronyms (AWS, API, SQL)
-            r'\b\w*(?:js|sql|api|sdk|ide|ui|ux|css|html|xml|json)\b',  # Technical suffixes
-            r'\b(?:python|java|javascript|react|angular|node|docker|kubernetes|aws|azure|gcp)\b',  # Popular techs
-        ]
+        # Extract meaningful words (3+ characters, not numbers) and count frequency
+        word_freq = Counter(word for word in _WORD_RE.findall(text) if word not in _JOB_STOP_WORDS)
         
-        technical_terms = []
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            technical_terms.extend(matches)
+        # Extract technical terms and skills; text is already lowercased, so a set
+        # gives O(1) membership tests for the scoring loop below
+        technical_terms = set()
+        for pattern in (_ACRONYM_RE, _TECH_SUFFIX_RE, _POP_TECH_RE):
+            technical_terms.update(pattern.findall(text))
         
         # Score and rank keywords
         scored_keywords = []
@@ -75,7 +271,7 @@ class MatchingEngine:
             score = freq
             
             # Boost technical terms
-            if word.lower() in [t.lower() for t in technical_terms]:
+            if word in technical_terms:
                 score *= 2
             
             # Boost longer, more specific terms
@@ -92,38 +288,133 @@ class MatchingEngine:
         return scored_keywords
     
     # Keep the original method for backward compatibility
-    def match_candidates(self, job_data, candidates):
+    def match_candidates(self, job_data, candidates, top_k=None):
         """Original method - kept for compatibility"""
-        return self.match_candidates_enhanced(job_data, candidates)
+        return self.match_candidates_enhanced(job_data, candidates, top_k=top_k)
     
-    def match_candidates_enhanced(self, job_data, candidates):
-        """Enhanced candidate matching with dynamic keywords"""
-        matches = []
-        
+    def build_candidate_features(self, raw_text):
+        """Precompute candidate-side matching features so they can be stored with the record"""
+        return {
+            'keyword_counts': dict(self._keyword_counts(raw_text))
+        }
+    
+    def match_candidates_enhanced(self, job_data, candidates, dynamic_keywords=None, top_k=None):
+        """Enhanced candidate matching with dynamic keywords.
+        
+        Returns MatchResult objects, best first; use to_dict() where plain dicts
+        are needed. When top_k is given, only the best top_k matches are returned.
+        """
+        # Keywords are extracted once at job creation; reuse them rather than re-deriving
+        if dynamic_keywords is None:
+            dynamic_keywords = job_data.get('dynamic_keywords', [])
+        
+        # Everything derived from the job is the same for every candidate
+        prepared_job = self._prepare_job(job_data, dynamic_keywords)
+        
+        # Rank lightweight (score, candidate) pairs and only build the result
+        # objects for the matches that are actually returned
+        scored = self._score_candidates(job_data, candidates, prepared_job)
+        
+        # Only the best few are needed: nlargest keeps a running top_k heap over
+        # the stream, so the full scored list is never built
+        if top_k is not None:
+            scored = heapq.nlargest(top_k, scored, key=itemgetter(0))
+        else:
+            # Sort by match score (highest first); itemgetter keeps the key call in C
+            scored = sorted(scored, key=itemgetter(0), reverse=True)
+        
+        return [
+            MatchResult(
+                candidate=candidate,
+                match_score=total_score,
+                match_breakdown=match_score['breakdown'],
+                strengths=match_score['strengths'],
+                gaps=match_score['gaps']
+            )
+            for total_score, match_score, candidate in scored
+        ]
+    
+    def _score_candidates(self, job_data, candidates, prepared_job):
+        """Yield (total_score, match_score, candidate) for each candidate"""
         for candidate in candidates:
-            match_score = self._calculate_enhanced_match_score(job_data, candidate['parsed_data'])
-            
-            matches.append({
-                'candidate': candidate,
-                'match_score': match_score['total_score'],
-                'match_breakdown': match_score['breakdown'],
-                'strengths': match_score['strengths'],
-                'gaps': match_score['gaps']
-            })
-        
-        # Sort by match score (highest first)
-        matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        return matches
+            match_score = self._calculate_enhanced_match_score(
+                job_data, candidate['parsed_data'],
+                prepared_job=prepared_job,
+                prepared_candidate=self.prepare_candidate(candidate)
+            )
+            yield match_score['total_score'], match_score, candidate
     
-    def _calculate_enhanced_match_score(self, job_data, candidate_data):
-        """Enhanced matching algorithm with better keyword matching"""
-        
-        # Skills matching (enhanced)
-        skills_score = self._calculate_skills_match_enhanced(
-            job_data.get('required_skills', []), 
-            candidate_data['skills']['all_skills']
+    def _prepare_job(self, job_data, dynamic_keywords=None):
+        """Derive the job-side inputs used by every per-candidate score"""
+        if dynamic_keywords is None:
+            dynamic_keywords = job_data.get('dynamic_keywords', [])
+        
+        required_skills = job_data.get('required_skills', [])
+        required_education = job_data.get('education_level', '')
+        job_word_freq = self._keyword_counts(job_data.get('description', ''))
+        
+        return PreparedJob(
+            required_skills=required_skills,
+            required_skills_lower=tuple((skill, skill.lower().strip()) for skill in required_skills if skill.strip()),
+            required_education_level=self._get_education_level(required_education) if required_education else 0,
+            job_word_freq=job_word_freq,
+            job_total_weight=sum(job_word_freq.values()),
+            dynamic_keywords=dynamic_keywords,
+            dynamic_keyword_terms=self._prepare_dynamic_keywords(dynamic_keywords)
         )
+    
+    def prepare_candidate(self, candidate):
+        """Derive the candidate-side inputs used by every job match.
+        
+        The result is cached by candidate id and upload date, so a pool matched
+        against several jobs only pays for this once per candidate.
+        """
+        candidate_id = candidate.get('id')
+        if candidate_id is None:
+            return self._derive_candidate(candidate['parsed_data'], candidate.get('features'))
+        
+        cache_key = (candidate_id, candidate.get('upload_date'))
+        prepared = self._prepared_candidate_cache.get(cache_key)
+        if prepared is None:
+            prepared = self._derive_candidate(candidate['parsed_data'], candidate.get('features'))
+            if len(self._prepared_candidate_cache) >= 4096:
+                self._prepared_candidate_cache.clear()
+            self._prepared_candidate_cache[cache_key] = prepared
+        return prepared
+    
+    def _derive_candidate(self, candidate_data, stored_features=None):
+        """Build a PreparedCandidate from parsed resume data"""
+        keyword_counts = stored_features.get('keyword_counts') if stored_features else None
+        if keyword_counts is None:
+            keyword_counts = self._keyword_counts(candidate_data.get('raw_text', ''))
+        
+        return PreparedCandidate(
+            skills_lower=frozenset(skill.lower().strip() for skill in candidate_data['skills']['all_skills']),
+            keyword_counts=keyword_counts,
+            education_level=max((self._get_education_level(degree) for degree in candidate_data['education']['degrees']),
+                                default=0),
+            text_lower=candidate_data.get('raw_text', '').lower()
+        )
+    
+    def _calculate_enhanced_match_score(self, job_data, candidate_data, prepared_job=None, prepared_candidate=None):
+        """Enhanced matching algorithm with better keyword matching"""
+        if prepared_job is None:
+            prepared_job = self._prepare_job(job_data)
+        if prepared_candidate is None:
+            prepared_candidate = self._derive_candidate(candidate_data)
+        
+        # Skills matching (enhanced). Here and below, a component the job gives
+        # nothing to match against scores a full 1.0 from a shared result,
+        # without calling its calculator
+        if prepared_job.required_skills:
+            skills_score = self._calculate_skills_match_enhanced(
+                prepared_job.required_skills, 
+                candidate_data['skills']['all_skills'],
+                prepared_job.required_skills_lower,
+                prepared_candidate.skills_lower
+            )
+        else:
+            skills_score = _NO_SKILLS_REQUIRED
         
         # Experience matching
         experience_score = self._calculate_experience_match(
@@ -134,28 +425,42 @@ class MatchingEngine:
         # Education matching
         education_score = self._calculate_education_match(
             job_data.get('education_level', ''),
-            candidate_data['education']['degrees']
+            candidate_data['education']['degrees'],
+            prepared_job.required_education_level,
+            prepared_candidate.education_level
         )
         
         # Keyword matching (enhanced)
-        keyword_score = self._calculate_keyword_match_enhanced(
-            job_data.get('description', ''),
-            candidate_data.get('raw_text', '')
-        )
+        if prepared_job.job_total_weight:
+            keyword_score = self._calculate_keyword_match_enhanced(
+                job_data.get('description', ''),
+                candidate_data.get('raw_text', ''),
+                prepared_candidate.keyword_counts,
+                prepared_job.job_word_freq,
+                prepared_job.job_total_weight
+            )
+        else:
+            keyword_score = _FULL_SCORE
         
         # Dynamic keyword matching (NEW)
-        dynamic_keyword_score = self._calculate_dynamic_keyword_match(
-            job_data.get('dynamic_keywords', []),
-            candidate_data.get('raw_text', '')
-        )
+        if prepared_job.dynamic_keywords:
+            dynamic_keyword_score = self._calculate_dynamic_keyword_match(
+                prepared_job.dynamic_keywords,
+                candidate_data.get('raw_text', ''),
+                prepared_job.dynamic_keyword_terms,
+                prepared_candidate.text_lower
+            )
+        else:
+            dynamic_keyword_score = _NO_DYNAMIC_KEYWORDS
         
-        # Calculate weighted total score
+        # Calculate weighted total score (local alias saves an attribute lookup per term)
+        weights = self.weights
         total_score = (
-            skills_score['score'] * self.weights['skills_match'] +
-            experience_score['score'] * self.weights['experience_match'] +
-            education_score['score'] * self.weights['education_match'] +
-            keyword_score['score'] * self.weights['keyword_match'] +
-            dynamic_keyword_score['score'] * self.weights['dynamic_keyword_match']
+            skills_score['score'] * weights['skills_match'] +
+            experience_score['score'] * weights['experience_match'] +
+            education_score['score'] * weights['education_match'] +
+            keyword_score['score'] * weights['keyword_match'] +
+            dynamic_keyword_score['score'] * weights['dynamic_keyword_match']
         )
         
         # Enhanced strengths and gaps analysis
@@ -194,80 +499,54 @@ class MatchingEngine:
         
         return {
             'total_score': round(total_score * 100, 2),
-            'breakdown': {
-                'skills': round(skills_score['score'] * 100, 2),
-                'experience': round(experience_score['score'] * 100, 2),
-                'education': round(education_score['score'] * 100, 2),
-                'keywords': round(keyword_score['score'] * 100, 2),
-                'dynamic_keywords': round(dynamic_keyword_score['score'] * 100, 2)
-            },
+            'breakdown': MatchBreakdown(
+                skills=round(skills_score['score'] * 100, 2),
+                experience=round(experience_score['score'] * 100, 2),
+                education=round(education_score['score'] * 100, 2),
+                keywords=round(keyword_score['score'] * 100, 2),
+                dynamic_keywords=round(dynamic_keyword_score['score'] * 100, 2)
+            ),
             'strengths': strengths,
             'gaps': gaps
         }
     
-    def _calculate_skills_match_enhanced(self, required_skills, candidate_skills):
+    def _calculate_skills_match_enhanced(self, required_skills, candidate_skills, required_skills_lower=None,
+                                         candidate_skills_lower=None):
         """Enhanced skills matching with synonym recognition"""
         if not required_skills:
             return {'score': 1.0, 'matched_count': 0, 'missing_count': 0, 'total_required': 0}
         
-        # Get candidate skills
-        candidate_skills_lower = [skill.lower().strip() for skill in candidate_skills]
-        
-        # Enhanced skill synonyms
-        skill_synonyms = {
-            'javascript': ['js', 'ecmascript', 'node.js', 'nodejs'],
-            'python': ['py'],
-            'react': ['reactjs', 'react.js'],
-            'angular': ['angularjs', 'angular.js'],
-            'machine learning': ['ml', 'artificial intelligence', 'ai'],
-            'amazon web services': ['aws'],
-            'microsoft azure': ['azure'],
-            'google cloud': ['gcp', 'google cloud platform'],
-            'docker': ['containerization'],
-            'kubernetes': ['k8s', 'container orchestration'],
-            'sql': ['mysql', 'postgresql', 'database'],
-            'css': ['css3', 'cascading style sheets'],
-            'html': ['html5', 'hypertext markup language']
-        }
+        if required_skills_lower is None:
+            required_skills_lower = tuple((skill, skill.lower().strip()) for skill in required_skills if skill.strip())
+        
+        # Get candidate skills; the set gives O(1) exact and synonym lookups
+        if candidate_skills_lower is None:
+            candidate_skills_lower = frozenset(skill.lower().strip() for skill in candidate_skills)
         
         matched_skills = []
         missing_skills = []
         
-        for required_skill in required_skills:
-            if not required_skill.strip():
-                continue
-                
-            required_lower = required_skill.lower().strip()
-            matched = False
-            
+        for required_skill, required_lower in required_skills_lower:
             # Direct match
-            if required_lower in candidate_skills_lower:
-                matched_skills.append(required_skill)
-                matched = True
-            else:
-                # Check synonyms and partial matches
-                for candidate_skill in candidate_skills_lower:
-                    # Check if required skill is contained in candidate skill
-                    if required_lower in candidate_skill or candidate_skill in required_lower:
-                        matched_skills.append(required_skill)
-                        matched = True
-                        break
-                    
-                    # Check synonym dictionary
-                    for main_skill, synonyms in skill_synonyms.items():
-                        if (required_lower == main_skill and candidate_skill in synonyms) or \
-                           (required_lower in synonyms and candidate_skill == main_skill):
-                            matched_skills.append(required_skill)
-                            matched = True
-                            break
-                    
-                    if matched:
-                        break
+            matched = required_lower in candidate_skills_lower
+            
+            if not matched:
+                # Synonyms in either direction: the required skill's aliases, or the
+                # main skill it is an alias of
+                related_skills = _RELATED_SKILLS.get(required_lower)
+                matched = related_skills is not None and not related_skills.isdisjoint(candidate_skills_lower)
             
             if not matched:
+                # Partial matches: one skill contained in the other
+                matched = any(required_lower in candidate_skill or candidate_skill in required_lower
+                              for candidate_skill in candidate_skills_lower)
+            
+            if matched:
+                matched_skills.append(required_skill)
+            else:
                 missing_skills.append(required_skill)
         
-        total_required = len([s for s in required_skills if s.strip()])
+        total_required = len(required_skills_lower)
         match_ratio = len(matched_skills) / total_required if total_required > 0 else 0
         
         return {
@@ -289,16 +568,8 @@ class MatchingEngine:
     def _skills_similar(self, skill1, skill2):
         """Check if two skills are similar (simple similarity check)"""
         # Simple fuzzy matching for common variations
-        synonyms = {
-            'js': 'javascript',
-            'react.js': 'react',
-            'node.js': 'nodejs',
-            'ai': 'artificial intelligence',
-            'ml': 'machine learning'
-        }
-        
-        skill1 = synonyms.get(skill1, skill1)
-        skill2 = synonyms.get(skill2, skill2)
+        skill1 = _SIMILAR_SKILL_ALIASES.get(skill1, skill1)
+        skill2 = _SIMILAR_SKILL_ALIASES.get(skill2, skill2)
         
         # Check if one skill contains the other (with length consideration)
         if len(skill1) > 2 and len(skill2) > 2:
@@ -324,13 +595,16 @@ class MatchingEngine:
         
         return {'score': score}
     
-    def _calculate_education_match(self, required_education, candidate_degrees):
+    def _calculate_education_match(self, required_education, candidate_degrees, required_level=None,
+                                   candidate_level=None):
         """Calculate education matching score"""
         if not required_education or not required_education.strip():
             return {'score': 1.0}
         
-        required_level = self._get_education_level(required_education)
-        candidate_level = max([self._get_education_level(degree) for degree in candidate_degrees], default=0)
+        if required_level is None:
+            required_level = self._get_education_level(required_education)
+        if candidate_level is None:
+            candidate_level = max((self._get_education_level(degree) for degree in candidate_degrees), default=0)
         
         if candidate_level >= required_level:
             return {'score': 1.0}
@@ -343,67 +617,75 @@ class MatchingEngine:
     
     def _get_education_level(self, education_text):
         """Get numeric education level from text"""
+        level = self._education_level_cache.get(education_text)
+        if level is not None:
+            return level
+        
         education_lower = education_text.lower()
+        level = 0
         
-        for level_name, level_value in self.education_hierarchy.items():
+        for level_name, level_value in _EDUCATION_HIERARCHY:
             if level_name in education_lower:
-                return level_value
+                level = level_value
+                break
         
-        return 0
+        if len(self._education_level_cache) >= 4096:
+            self._education_level_cache.clear()
+        self._education_level_cache[education_text] = level
+        return level
     
     def _calculate_keyword_match(self, job_description, candidate_text):
         """Original keyword matching - kept for compatibility"""
         return self._calculate_keyword_match_enhanced(job_description, candidate_text)
     
-    def _calculate_keyword_match_enhanced(self, job_description, candidate_text):
+    def _calculate_keyword_match_enhanced(self, job_description, candidate_text, candidate_keyword_counts=None,
+                                          job_freq=None, job_total_weight=None):
         """Enhanced keyword matching"""
         if not job_description:
             return {'score': 1.0}
         
-        # Extract meaningful keywords from both texts
-        job_keywords = self._extract_meaningful_keywords(job_description)
-        candidate_keywords = self._extract_meaningful_keywords(candidate_text)
+        # Extract meaningful keywords from the job description unless the caller already did
+        if job_freq is None:
+            job_freq = self._keyword_counts(job_description)
+            job_total_weight = sum(job_freq.values())
         
-        if not job_keywords:
+        if not job_freq:
             return {'score': 1.0}
         
-        # Calculate overlap with TF-IDF-like scoring
-        job_freq = Counter(job_keywords)
-        candidate_freq = Counter(candidate_keywords)
-        
-        total_score = 0
-        max_possible_score = 0
+        # Calculate overlap with TF-IDF-like scoring; candidate counts may be precomputed at upload
+        if candidate_keyword_counts is not None:
+            candidate_freq = candidate_keyword_counts
+        else:
+            candidate_freq = self._keyword_counts(candidate_text)
         
-        for keyword, job_count in job_freq.items():
-            candidate_count = candidate_freq.get(keyword, 0)
-            
-            # Score based on frequency in both documents
-            keyword_score = min(job_count, candidate_count) / job_count
-            total_score += keyword_score * job_count
-            max_possible_score += job_count
+        # Each shared keyword earns min(job count, candidate count); only the keys
+        # present in both documents can contribute
+        total_score = sum(min(job_freq[keyword], candidate_freq[keyword])
+                          for keyword in job_freq.keys() & candidate_freq.keys())
         
-        final_score = total_score / max_possible_score if max_possible_score > 0 else 0
+        final_score = total_score / job_total_weight if job_total_weight > 0 else 0
         return {'score': min(1.0, final_score)}
     
-    def _calculate_dynamic_keyword_match(self, dynamic_keywords, candidate_text):
+    def _calculate_dynamic_keyword_match(self, dynamic_keywords, candidate_text, keyword_terms=None,
+                                         candidate_text_lower=None):
         """Match against dynamically extracted keywords"""
         if not dynamic_keywords:
             return {'score': 1.0, 'matched_count': 0}
         
-        candidate_text_lower = candidate_text.lower()
+        if keyword_terms is None:
+            keyword_terms = self._prepare_dynamic_keywords(dynamic_keywords)
+        
+        if candidate_text_lower is None:
+            candidate_text_lower = candidate_text.lower()
         matches = []
         total_score = 0
         max_possible_score = 0
         
-        for keyword_data in dynamic_keywords:
-            keyword = keyword_data['keyword'].lower()
-            importance_score = keyword_data['score']
-            
-            # Check if keyword exists in candidate text
-            if keyword in candidate_text_lower:
-                # Count occurrences
-                occurrences = candidate_text_lower.count(keyword)
-                match_score = min(1.0, occurrences / keyword_data['frequency']) * importance_score
+        for keyword, frequency, importance_score in keyword_terms:
+            # A single count() both detects and counts the keyword, one scan per keyword
+            occurrences = candidate_text_lower.count(keyword)
+            if occurrences:
+                match_score = min(1.0, occurrences / frequency) * importance_score
                 
                 matches.append(keyword)
                 total_score += match_score
@@ -417,134 +699,82 @@ class MatchingEngine:
             'matched_count': len(matches)
         }
     
+    def _prepare_dynamic_keywords(self, dynamic_keywords):
+        """(lowercased keyword, frequency, importance) triples for dynamic keyword matching"""
+        return tuple((keyword_data['keyword'].lower(), keyword_data['frequency'], keyword_data['score'])
+                     for keyword_data in dynamic_keywords)
+    
+    def _keyword_counts(self, text):
+        """Meaningful-keyword frequencies for text, memoized (treat as read-only)"""
+        counts = self._keyword_count_cache.get(text)
+        if counts is not None:
+            return counts
+        
+        counts = Counter(self._extract_meaningful_keywords(text))
+        if len(self._keyword_count_cache) >= 512:
+            self._keyword_count_cache.clear()
+        self._keyword_count_cache[text] = counts
+        return counts
+    
     def _extract_meaningful_keywords(self, text):
         """Extract meaningful keywords from text"""
         if not text:
             return []
         
-        # Clean and tokenize
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        
-        # Enhanced stop words
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her',
-            'was', 'one', 'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its',
-            'may', 'new', 'now', 'old', 'see', 'two', 'who', 'boy', 'did', 'she', 'use',
-            'way', 'will', 'have', 'been', 'that', 'this', 'with', 'from', 'they', 'know',
-            'want', 'been', 'good', 'much', 'some', 'time', 'very', 'when', 'come', 'here',
-            'just', 'like', 'long', 'make', 'many', 'over', 'such', 'take', 'than', 'them',
-            'well', 'were', 'what', 'your', 'work', 'years', 'would', 'there', 'said',
-            'each', 'which', 'their', 'called', 'other', 'made', 'more', 'find', 'where'
-        }
+        # Clean and tokenize; the pattern only yields alphabetic words of 4+ letters
+        words = _MEANINGFUL_WORD_RE.findall(text.lower())
         
         # Filter meaningful words
-        meaningful_words = []
-        for word in words:
-            if (word not in stop_words and 
-                len(word) > 3 and 
-                not word.isdigit() and
-                word.isalpha()):
-                meaningful_words.append(word)
-        
-        return meaningful_words
+        return [word for word in words if word not in _STOP_WORDS]
     
     def _extract_important_words(self, text):
         """Extract important words from text (kept for compatibility)"""
         return self._extract_meaningful_keywords(text)
     
     def generate_suggestions(self, candidate_data):
-        """Enhanced suggestion generation"""
-        suggestions = []
+        """Enhanced suggestion generation.
         
+        Yields suggestions lazily; wrap in list() when all of them are needed.
+        """
         # Skills suggestions
         skills_count = candidate_data['skills']['skill_count']
         if skills_count < 5:
-            suggestions.append({
-                'category': 'Skills',
-                'priority': 'Critical',
-                'suggestion': 'Add more technical skills to your resume. Include programming languages, frameworks, tools, and technologies you have experience with.',
-                'impact': 'Significantly improves keyword matching and demonstrates technical competency'
-            })
+            yield _SUGGESTIONS['skills_critical']
         elif skills_count < 10:
-            suggestions.append({
-                'category': 'Skills',
-                'priority': 'High',
-                'suggestion': 'Expand your skills section with more specialized technologies and emerging skills relevant to your field.',
-                'impact': 'Helps you stand out for advanced positions and increases ATS matching'
-            })
+            yield _SUGGESTIONS['skills_expand']
         
         # Experience suggestions
         exp_years = candidate_data['experience']['estimated_years']
         title_count = candidate_data['experience']['title_count']
         
         if exp_years < 2:
-            suggestions.append({
-                'category': 'Experience',
-                'priority': 'High',
-                'suggestion': 'Strengthen your experience section by including internships, projects, volunteer work, or part-time roles.',
-                'impact': 'Demonstrates practical application of skills and increases experience score'
-            })
+            yield _SUGGESTIONS['experience_more']
         
         if title_count < 2:
-            suggestions.append({
-                'category': 'Experience',
-                'priority': 'Medium',
-                'suggestion': 'Use more specific job titles and include quantifiable achievements with metrics and numbers.',
-                'impact': 'Makes your experience more concrete and measurable for recruiters'
-            })
+            yield _SUGGESTIONS['experience_titles']
         
         # Education suggestions
         degree_count = candidate_data['education']['degree_count']
         if degree_count == 0:
-            suggestions.append({
-                'category': 'Education',
-                'priority': 'Medium',
-                'suggestion': 'Include your educational background, certifications, or relevant coursework.',
-                'impact': 'Meets basic educational requirements and improves credibility'
-            })
+            yield _SUGGESTIONS['education_missing']
         
         # Content and formatting suggestions
         word_count = candidate_data['summary_stats']['word_count']
         if word_count < 200:
-            suggestions.append({
-                'category': 'Content',
-                'priority': 'Critical',
-                'suggestion': 'Expand your resume with more detailed descriptions of your experience and achievements.',
-                'impact': 'Provides more context for ATS matching and gives recruiters better insights'
-            })
+            yield _SUGGESTIONS['content_expand']
         elif word_count > 800:
-            suggestions.append({
-                'category': 'Content',
-                'priority': 'Low',
-                'suggestion': 'Consider condensing your resume to focus on the most relevant and recent experiences.',
-                'impact': 'Improves readability and focuses attention on key qualifications'
-            })
+            yield _SUGGESTIONS['content_condense']
         
         # Contact information suggestions
         contact_info = candidate_data.get('contact_info', {})
         if not contact_info.get('email'):
-            suggestions.append({
-                'category': 'Contact Info',
-                'priority': 'Critical',
-                'suggestion': 'Add a professional email address to your resume.',
-                'impact': 'Essential for recruiters to contact you - missing email is a major red flag'
-            })
+            yield _SUGGESTIONS['contact_email']
         
         if not contact_info.get('phone'):
-            suggestions.append({
-                'category': 'Contact Info',
-                'priority': 'High',
-                'suggestion': 'Include a phone number with proper formatting.',
-                'impact': 'Provides additional contact method and shows professionalism'
-            })
+            yield _SUGGESTIONS['contact_phone']
         
         if not contact_info.get('linkedin'):
-            suggestions.append({
-                'category': 'Contact Info',
-                'priority': 'High',
-                'suggestion': 'Include your LinkedIn profile URL.',
-                'impact': 'Allows recruiters to see your professional network and endorsements'
-            })
+            yield _SUGGESTIONS['contact_linkedin']
         
         # Keyword density analysis
         keyword_data = candidate_data.get('keywords', {})
@@ -552,11 +782,4 @@ class MatchingEngine:
         total_words = keyword_data.get('total_words', 1)
         
         if unique_words / total_words < 0.3:
-            suggestions.append({
-                'category': 'Keywords',
-                'priority': 'Medium',
-                'suggestion': 'Use more varied vocabulary and industry-specific terms throughout your resume.',
-                'impact': 'Improves matching with diverse job descriptions and shows depth of knowledge'
-            })
-        
-        return suggestions
\ No newline at end of file
+            yield _SUGGESTIONS['keywords_variety']
\ No newline at end of file
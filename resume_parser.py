@@ -1,29 +1,126 @@
 # resume_parser.py - Resume Parsing Engine
 import PyPDF2
-import docx
+from lxml import etree
 import re
 from collections import Counter
 import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
 import os
+import functools
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-# Download required NLTK data (run once)
+# PDFium extracts text much faster than PyPDF2; PyPDF2 is the fallback
 try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# PDFium is not thread-safe, even across documents, and resumes are parsed on a thread pool
+_PDFIUM_LOCK = threading.Lock()
 
+# Download required NLTK data (run once)
 try:
     nltk.data.find('corpora/stopwords')
 except LookupError:
     nltk.download('stopwords')
 
+# WordprocessingML tags read when extracting DOCX text
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = _W + 'body'
+_W_P = _W + 'p'
+_W_R = _W + 'r'
+_W_T = _W + 't'
+_W_TAB = _W + 'tab'
+_W_BREAKS = (_W + 'br', _W + 'cr')
+
+# Email addresses, including ones with stray spaces around '@' and '.'
+_EMAIL_PATTERNS = [
+    re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    re.compile(r'\b[A-Za-z0-9._%+-]+\s*@\s*[A-Za-z0-9.-]+\s*\.\s*[A-Z|a-z]{2,}\b')
+]
+
+# Enhanced phone number patterns
+_PHONE_PATTERNS = [
+    # US formats; the +1 country code is kept out of the number's capture group
+    re.compile(r'\+?1[-.\s]?(\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})'),
+    re.compile(r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}'),
+    # International formats
+    re.compile(r'\+[0-9]{1,4}[-.\s]?\(?[0-9]{1,4}\)?[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}'),
+    # General patterns
+    re.compile(r'[0-9]{3}[-.\s][0-9]{3}[-.\s][0-9]{4}'),
+    re.compile(r'\([0-9]{3}\)\s*[0-9]{3}[-.\s]?[0-9]{4}'),
+    # 10-digit numbers
+    re.compile(r'\b[0-9]{10}\b')
+]
+
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+
+# LinkedIn profile URLs, tried in order against lowercased text
+_LINKEDIN_PATTERNS = [
+    re.compile(r'linkedin\.com/in/[\w-]+'),
+    re.compile(r'linkedin\.com/pub/[\w-]+'),
+    re.compile(r'www\.linkedin\.com/in/[\w-]+'),
+    re.compile(r'https?://(?:www\.)?linkedin\.com/in/[\w-]+')
+]
+
+# Four-digit years (e.g. 2020-2023); non-capturing so findall returns whole years, and
+# bounded so digit runs such as phone numbers or IDs don't yield years. A bytes pattern:
+# scanning the UTF-8 buffer is much cheaper than a str that curly quotes widened to UCS-2
+_YEAR_RE = re.compile(rb'\b(?:19|20)\d{2}\b')
+
+# Whole words containing a common job title keyword
+_TITLE_KEYWORDS = ['manager', 'developer', 'engineer', 'analyst', 'director', 'specialist',
+                   'coordinator', 'consultant', 'lead', 'senior', 'junior', 'intern']
+_TITLE_RE = re.compile(r'\b\w*(?:' + '|'.join(_TITLE_KEYWORDS) + r')\w*\b', re.IGNORECASE)
+
+# Degree patterns
+_DEGREE_PATTERNS = [
+    re.compile(r'\b(bachelor|master|phd|doctorate|associate|diploma|certificate)\b', re.IGNORECASE),
+    re.compile(r'\b(b\.?a\.?|b\.?s\.?|m\.?a\.?|m\.?s\.?|ph\.?d\.?|m\.?b\.?a\.?)\b', re.IGNORECASE),
+    re.compile(r'\b(undergraduate|graduate|postgraduate)\b', re.IGNORECASE)
+]
+
+# University/College patterns
+_INSTITUTION_RE = re.compile(r'university|college|institute|school', re.IGNORECASE)
+
+# Whole words made only of letters (no digits or underscores), for keyword counting
+_WORD_RE = re.compile(r'\b[^\W\d_]+\b')
+
+@functools.cache
+def _get_stop_words():
+    """English stop words, read from the NLTK corpus once per process"""
+    return frozenset(stopwords.words('english'))
+
+
+@functools.cache
+def _get_stemmer():
+    """Shared PorterStemmer; it keeps no per-call state"""
+    return PorterStemmer()
+
+
+# Per-process parser used by ResumeParser.parse_batch workers
+_worker_parser = None
+
+
+def _parse_one(filepath):
+    """Parse one resume in a worker process, reusing that process's parser"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParser()
+    return _worker_parser.parse_resume(filepath)
+
+
 class ResumeParser:
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.stemmer = PorterStemmer()
+    def __init__(self, stem=False):
+        self.stop_words = _get_stop_words()
+        self.stemmer = _get_stemmer()
+        
+        # Collapse keyword variants ("developer", "developing") to Porter stems
+        self.stem = stem
         
         # Common skills database (can be expanded)
         self.skills_database = {
@@ -41,19 +138,26 @@ class ResumeParser:
         for category, skills in self.skills_database.items():
             self.all_skills.extend(skills)
         
+        # (skill, lowercased skill, category) entries in database order, so _extract_skills
+        # finds and categorizes each skill in one pass without re-lowercasing the database
+        self._skills_lower = tuple((skill, skill.lower(), category)
+                                   for category, skills in self.skills_database.items()
+                                   for skill in skills)
+        
+        # One alternation over every skill for a single scan of the resume. Longest first,
+        # and the lookarounds keep skills from matching inside other words ('go' in 'good').
+        # Trailing digits are allowed so versioned spellings (html5, python3, c++11) still count,
+        # as are a few suffixes that keep the skill's meaning: reactjs/vue.js, golang, dockerized
+        skill_alternation = '|'.join(re.escape(skill_lower) for skill_lower in
+                                     sorted({entry[1] for entry in self._skills_lower}, key=len, reverse=True))
+        self._skills_re = re.compile(r'(?<![A-Za-z0-9])(?:' + skill_alternation + r')'
+                                     r'(?:(?=(?:\.?js|lang|i[sz]ed)\b)|(?![A-Za-z]))')
+        
         # Enhanced phone number patterns
-        self.phone_patterns = [
-            # US formats
-            r'\+?1[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
-            r'\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
-            # International formats
-            r'\+[0-9]{1,4}[-.\s]?\(?[0-9]{1,4}\)?[-.\s]?[0-9]{3,4}[-.\s]?[0-9]{3,4}',
-            # General patterns
-            r'[0-9]{3}[-.\s][0-9]{3}[-.\s][0-9]{4}',
-            r'\([0-9]{3}\)\s*[0-9]{3}[-.\s]?[0-9]{4}',
-            # 10-digit numbers
-            r'\b[0-9]{10}\b'
-        ]
+        self.phone_patterns = _PHONE_PATTERNS
+        
+        # parse_resume results keyed by (filepath, mtime_ns, size), so an unchanged file is parsed once
+        self._parse_cache = {}
     
     def extract_text_from_file(self, filepath):
         """Extract text from various file formats"""
@@ -76,12 +180,28 @@ class ResumeParser:
     
     def _extract_from_pdf(self, filepath):
         """Extract text from PDF"""
-        text = ""
         try:
-            with open(filepath, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            if pdfium is not None:
+                # Every PDFium call, including closing pages and the document, holds the lock
+                with _PDFIUM_LOCK:
+                    pdf = pdfium.PdfDocument(filepath)
+                    try:
+                        pages = []
+                        for page in pdf:
+                            textpage = page.get_textpage()
+                            # PDFium separates lines with \r\n; the rest of the parser splits on \n
+                            pages.append(textpage.get_text_range().replace('\r\n', '\n'))
+                            textpage.close()
+                            page.close()
+                    finally:
+                        pdf.close()
+            else:
+                with open(filepath, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    pages = [page.extract_text() for page in pdf_reader.pages]
+            
+            # One join instead of growing the string page by page
+            text = "".join(page_text + "\n" for page_text in pages)
         except Exception as e:
             raise Exception(f"PDF extraction error: {str(e)}")
         return text
@@ -89,8 +209,27 @@ class ResumeParser:
     def _extract_from_docx(self, filepath):
         """Extract text from DOCX"""
         try:
-            doc = docx.Document(filepath)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            # Parse word/document.xml directly instead of building python-docx objects;
+            # body paragraphs and run text match python-docx's Document.paragraphs
+            with zipfile.ZipFile(filepath) as archive:
+                with archive.open('word/document.xml') as document:
+                    # Uploaded XML is untrusted: never expand entities or fetch over the network
+                    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+                    root = etree.parse(document, parser).getroot()
+            
+            paragraphs = []
+            for paragraph in root.find(_W_BODY).iterfind(_W_P):
+                parts = []
+                for run in paragraph.iterfind(_W_R):
+                    for child in run:
+                        if child.tag == _W_T:
+                            parts.append(child.text or '')
+                        elif child.tag == _W_TAB:
+                            parts.append('\t')
+                        elif child.tag in _W_BREAKS:
+                            parts.append('\n')
+                paragraphs.append(''.join(parts))
+            text = "\n".join(paragraphs)
         except Exception as e:
             raise Exception(f"DOCX extraction error: {str(e)}")
         return text
@@ -105,67 +244,82 @@ class ResumeParser:
         return text
     
     def parse_resume(self, filepath):
-        """Main function to parse resume and extract structured data"""
+        """Main function to parse resume and extract structured data.
+        
+        Results are cached per file version; treat the returned dict as read-only.
+        """
+        stat = os.stat(filepath)
+        cache_key = (filepath, stat.st_mtime_ns, stat.st_size)
+        parsed_data = self._parse_cache.get(cache_key)
+        if parsed_data is not None:
+            return parsed_data
+        
         # Extract raw text
         raw_text = self.extract_text_from_file(filepath)
         
         # Parse different sections
+        # Lowercase once for every extractor that needs it
+        text_lower = raw_text.lower()
+        
         parsed_data = {
             'raw_text': raw_text,
-            'contact_info': self._extract_contact_info(raw_text),
-            'skills': self._extract_skills(raw_text),
+            'contact_info': self._extract_contact_info(raw_text, text_lower),
+            'skills': self._extract_skills(raw_text, text_lower),
             'experience': self._extract_experience(raw_text),
             'education': self._extract_education(raw_text),
-            'keywords': self._extract_keywords(raw_text),
+            'keywords': self._extract_keywords(raw_text, text_lower),
             'summary_stats': self._generate_summary_stats(raw_text)
         }
         
+        if len(self._parse_cache) >= 128:
+            self._parse_cache.clear()
+        self._parse_cache[cache_key] = parsed_data
         return parsed_data
     
-    def _extract_contact_info(self, text):
+    @staticmethod
+    def parse_batch(filepaths, workers=None):
+        """Parse several resumes in parallel worker processes; results follow filepaths order.
+        
+        Workers use a default ResumeParser (stem=False), whatever the calling
+        parser's settings. They are spawned rather than forked, so they never
+        inherit locks (such as the PDFium lock) held by the caller's other threads.
+        """
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(_parse_one, filepaths, chunksize=4))
+    
+    def _extract_contact_info(self, text, text_lower=None):
         """Enhanced contact information extraction"""
         contact_info = {}
         
-        # Enhanced email extraction
-        email_patterns = [
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            r'\b[A-Za-z0-9._%+-]+\s*@\s*[A-Za-z0-9.-]+\s*\.\s*[A-Z|a-z]{2,}\b'
-        ]
-        
-        emails = []
-        for pattern in email_patterns:
-            emails.extend(re.findall(pattern, text))
-        
-        # Clean and validate emails
-        valid_emails = []
-        for email in emails:
-            email = email.strip().replace(' ', '')
-            if '@' in email and '.' in email.split('@')[1]:
-                valid_emails.append(email)
-        
-        contact_info['email'] = valid_emails[0] if valid_emails else None
-        
-        # Enhanced phone number extraction
-        phones = []
+        # Enhanced email extraction; only the first valid address is used, so patterns
+        # are tried in order and scanning stops at the first hit
+        contact_info['email'] = None
+        for pattern in _EMAIL_PATTERNS:
+            for match in pattern.finditer(text):
+                # Clean and validate emails
+                email = match.group().strip().replace(' ', '')
+                if '@' in email and '.' in email.split('@')[1]:
+                    contact_info['email'] = email
+                    break
+            if contact_info['email']:
+                break
+        
+        # Enhanced phone number extraction; likewise stop at the first valid number
+        best_phone = None
         for pattern in self.phone_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):
-                    # Reconstruct phone from groups
-                    phone = ''.join(match)
-                else:
-                    phone = match
-                
-                # Clean phone number
-                phone = re.sub(r'[^\d]', '', phone)
+            for match in pattern.finditer(text):
+                # Clean phone number (without the country code, if captured apart)
+                phone = _NON_DIGIT_RE.sub('', match.group(match.lastindex or 0))
                 
                 # Validate phone length (US: 10 digits, International: 7-15 digits)
                 if 7 <= len(phone) <= 15:
-                    phones.append(phone)
+                    best_phone = phone
+                    break
+            if best_phone:
+                break
         
         # Format the best phone number
-        if phones:
-            best_phone = phones[0]
+        if best_phone:
             if len(best_phone) == 10:
                 # Format US number: (XXX) XXX-XXXX
                 formatted = f"({best_phone[:3]}) {best_phone[3:6]}-{best_phone[6:]}"
@@ -175,22 +329,18 @@ class ResumeParser:
         else:
             contact_info['phone'] = None
         
-        # Enhanced LinkedIn extraction
-        linkedin_patterns = [
-            r'linkedin\.com/in/[\w-]+',
-            r'linkedin\.com/pub/[\w-]+',
-            r'www\.linkedin\.com/in/[\w-]+',
-            r'https?://(?:www\.)?linkedin\.com/in/[\w-]+'
-        ]
-        
-        linkedin_urls = []
-        for pattern in linkedin_patterns:
-            matches = re.findall(pattern, text.lower())
-            linkedin_urls.extend(matches)
-        
-        if linkedin_urls:
+        # Enhanced LinkedIn extraction; the first pattern with a match wins
+        if text_lower is None:
+            text_lower = text.lower()
+        linkedin = None
+        for pattern in _LINKEDIN_PATTERNS:
+            match = pattern.search(text_lower)
+            if match:
+                linkedin = match.group()
+                break
+        
+        if linkedin:
             # Clean up the URL
-            linkedin = linkedin_urls[0]
             if not linkedin.startswith('http'):
                 linkedin = 'https://' + linkedin
             contact_info['linkedin'] = linkedin
@@ -205,7 +355,8 @@ class ResumeParser:
         for i, line in enumerate(lines[:5]):
             # Skip lines with common resume headers
             skip_keywords = ['resume', 'cv', 'curriculum', 'vitae', '@', 'phone', 'email', 'address']
-            if not any(keyword in line.lower() for keyword in skip_keywords):
+            line_lower = line.lower()
+            if not any(keyword in line_lower for keyword in skip_keywords):
                 # Check if line looks like a name (2-4 words, mostly letters)
                 words = line.split()
                 if 2 <= len(words) <= 4:
@@ -216,25 +367,21 @@ class ResumeParser:
         
         return contact_info
     
-    def _extract_skills(self, text):
+    def _extract_skills(self, text, text_lower=None):
         """Extract skills from resume text"""
-        text_lower = text.lower()
-        found_skills = []
-        
-        # Find skills from our database
-        for skill in self.all_skills:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        
-        # Remove duplicates and sort
-        found_skills = list(set(found_skills))
+        if text_lower is None:
+            text_lower = text.lower()
+        skill_hits = set(self._skills_re.findall(text_lower))
         
-        # Categorize skills
+        # Map hits back to database skills and file each under its category as we go;
+        # the set removes duplicates
+        found_skills = set()
         categorized_skills = {}
-        for category, skills in self.skills_database.items():
-            category_skills = [skill for skill in found_skills if skill.lower() in [s.lower() for s in skills]]
-            if category_skills:
-                categorized_skills[category] = category_skills
+        for skill, skill_lower, category in self._skills_lower:
+            if skill_lower in skill_hits:
+                found_skills.add(skill)
+                categorized_skills.setdefault(category, []).append(skill)
+        found_skills = list(found_skills)
         
         return {
             'all_skills': found_skills,
@@ -245,71 +392,64 @@ class ResumeParser:
     def _extract_experience(self, text):
         """Extract work experience information"""
         # Look for year patterns (e.g., 2020-2023, 2020-present)
-        year_pattern = r'(19|20)\d{2}'
-        years = re.findall(year_pattern, text)
+        years = [year.decode('ascii') for year in _YEAR_RE.findall(text.encode('utf-8', 'ignore'))]
         
         # Estimate years of experience
-        if years:
-            years_int = [int(year) for year in years]
-            experience_years = max(years_int) - min(years_int) if len(years_int) > 1 else 0
+        if len(years) > 1:
+            years_int = list(map(int, years))
+            experience_years = max(years_int) - min(years_int)
         else:
             experience_years = 0
         
-        # Look for job titles (common patterns)
-        title_keywords = ['manager', 'developer', 'engineer', 'analyst', 'director', 'specialist', 
-                         'coordinator', 'consultant', 'lead', 'senior', 'junior', 'intern']
-        
-        found_titles = []
-        for keyword in title_keywords:
-            pattern = r'\b\w*' + keyword + r'\w*\b'
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            found_titles.extend(matches)
+        # Look for job titles (common patterns); one scan finds words containing any title keyword
+        found_titles = set(_TITLE_RE.findall(text))
         
         return {
             'estimated_years': experience_years,
             'years_mentioned': years,
-            'potential_titles': list(set(found_titles)),
-            'title_count': len(set(found_titles))
+            'potential_titles': list(found_titles),
+            'title_count': len(found_titles)
         }
     
     def _extract_education(self, text):
         """Extract education information"""
         # Degree patterns
-        degree_patterns = [
-            r'\b(bachelor|master|phd|doctorate|associate|diploma|certificate)\b',
-            r'\b(b\.?a\.?|b\.?s\.?|m\.?a\.?|m\.?s\.?|ph\.?d\.?|m\.?b\.?a\.?)\b',
-            r'\b(undergraduate|graduate|postgraduate)\b'
-        ]
-        
-        found_degrees = []
-        for pattern in degree_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            found_degrees.extend(matches)
+        found_degrees = set()
+        for pattern in _DEGREE_PATTERNS:
+            found_degrees.update(pattern.findall(text))
         
         # University/College patterns
-        education_institutions = re.findall(r'university|college|institute|school', text, re.IGNORECASE)
+        education_institutions = _INSTITUTION_RE.findall(text)
         
         return {
-            'degrees': list(set(found_degrees)),
+            'degrees': list(found_degrees),
             'education_mentioned': len(education_institutions) > 0,
-            'degree_count': len(set(found_degrees))
+            'degree_count': len(found_degrees)
         }
     
-    def _extract_keywords(self, text):
+    def _extract_keywords(self, text, text_lower=None):
         """Extract important keywords using NLP"""
-        # Tokenize and clean
-        tokens = word_tokenize(text.lower())
-        tokens = [token for token in tokens if token.isalpha() and token not in self.stop_words]
-        tokens = [self.stemmer.stem(token) for token in tokens]
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        # Tokenize, clean and count in one stream; the regex only yields alphabetic words
+        word_freq = Counter(token for token in _WORD_RE.findall(text_lower) if token not in self.stop_words)
+        
+        if self.stem:
+            # Stem each distinct word once and merge the counts of words sharing a stem
+            stem = self.stemmer.stem
+            stemmed_freq = Counter()
+            for word, count in word_freq.items():
+                stemmed_freq[stem(word)] += count
+            word_freq = stemmed_freq
         
-        # Get most common words
-        word_freq = Counter(tokens)
+        # Get most common words (most_common(n) keeps a bounded heap rather than sorting everything)
         top_keywords = word_freq.most_common(20)
         
         return {
             'top_keywords': top_keywords,
-            'total_words': len(tokens),
-            'unique_words': len(set(tokens))
+            'total_words': sum(word_freq.values()),
+            'unique_words': len(word_freq)
         }
     
     def _generate_summary_stats(self, text):